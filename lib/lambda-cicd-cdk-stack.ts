@@ -62,9 +62,29 @@ export class LambdaCicdCdkStack extends cdk.Stack {
       topicName: `${environment}-notifications`,
     });
 
+    // Precompile bytecode at bundle time so cold starts skip compiling .py files.
+    // unchecked-hash keeps the .pyc valid regardless of the mtimes in the deployment zip.
+    const compileAllCommand = (dir: string) =>
+      `python -m compileall -q --invalidation-mode unchecked-hash ${dir}`;
+    const pythonBundling = {
+      commandHooks: {
+        beforeBundling: (): string[] => [],
+        afterBundling: (_inputDir: string, outputDir: string): string[] => [compileAllCommand(outputDir)],
+      },
+    };
+
     // Common Lambda Layer
     const commonLayer = new lambda.LayerVersion(this, 'CommonLayer', {
-      code: lambda.Code.fromAsset('src/layers/common'),
+      code: lambda.Code.fromAsset('src/layers/common', {
+        bundling: {
+          image: lambda.Runtime.PYTHON_3_9.bundlingImage,
+          command: [
+            'bash', '-c',
+            'pip install -r /asset-input/requirements.txt -t /asset-output/python && ' +
+            `cp -r /asset-input/. /asset-output && ${compileAllCommand('/asset-output/python')}`,
+          ],
+        },
+      }),
       compatibleRuntimes: [lambda.Runtime.PYTHON_3_9],
       description: 'Common utilities for Lambda functions',
     });
@@ -80,6 +100,7 @@ export class LambdaCicdCdkStack extends cdk.Stack {
         USER_TABLE_NAME: userTable.tableName,
       },
       tracing: lambda.Tracing.ACTIVE,
+      bundling: pythonBundling,
     });
 
     const dataProcessorFunction = new PythonFunction(this, 'DataProcessorFunction', {
@@ -93,6 +114,7 @@ export class LambdaCicdCdkStack extends cdk.Stack {
         DATA_BUCKET_NAME: dataBucket.bucketName,
       },
       tracing: lambda.Tracing.ACTIVE,
+      bundling: pythonBundling,
     });
 
     const notificationFunction = new PythonFunction(this, 'NotificationFunction', {
@@ -106,6 +128,7 @@ export class LambdaCicdCdkStack extends cdk.Stack {
         SNS_TOPIC_ARN: notificationTopic.topicArn,
       },
       tracing: lambda.Tracing.ACTIVE,
+      bundling: pythonBundling,
     });
 
     const healthCheckFunction = new PythonFunction(this, 'HealthCheckFunction', {
@@ -116,6 +139,7 @@ export class LambdaCicdCdkStack extends cdk.Stack {
         LOG_LEVEL: logLevel,
       },
       tracing: lambda.Tracing.ACTIVE,
+      bundling: pythonBundling,
     });
 
     // Grant permissions
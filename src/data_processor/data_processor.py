@@ -1,11 +1,9 @@
+import logging
 import os
-import sys
 import uuid
 import boto3
-
-# Lambda Layerのパスを追加
-sys.path.insert(0, '/opt/python')
-sys.path.insert(0, '/opt/python/lib/python3.9/site-packages')
+from concurrent.futures import ThreadPoolExecutor
+from functools import singledispatch
 
 from utils import (
     create_response,
@@ -16,13 +14,26 @@ from utils import (
 from db import DynamoDBManager
 
 
+# ロガーの設定
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
 # 環境変数
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
 PROCESSED_DATA_TABLE_NAME = os.environ.get('PROCESSED_DATA_TABLE_NAME', f"{ENVIRONMENT}-processed-data")
 DATA_BUCKET_NAME = os.environ.get('DATA_BUCKET_NAME', f"{ENVIRONMENT}-data-bucket")
 
-# 有効なデータタイプ
-VALID_DATA_TYPES = ['text', 'json', 'csv', 'xml', 'binary']
+# 有効なデータタイプ（エラーメッセージは定義順、判定はfrozensetで行う）
+_DATA_TYPES_ORDER = ('text', 'json', 'csv', 'xml', 'binary')
+VALID_DATA_TYPES = frozenset(_DATA_TYPES_ORDER)
+_VALID_DATA_TYPES_STR = ', '.join(_DATA_TYPES_ORDER)
+
+# S3 HEADリクエストの最大同時実行数
+S3_HEAD_MAX_WORKERS = 16
+
+# AWS クライアントとDBマネージャーの初期化（コールドスタート時に一度だけ実行）
+S3_CLIENT = boto3.client('s3')
+DB_MANAGER = DynamoDBManager(PROCESSED_DATA_TABLE_NAME)
 
 
 def lambda_handler(event, context):
@@ -30,29 +41,25 @@ def lambda_handler(event, context):
     log_event(event, context)
 
     try:
-        # AWS クライアントとDBマネージャーの初期化
-        s3_client = boto3.client('s3')
-        db_manager = DynamoDBManager(PROCESSED_DATA_TABLE_NAME)
-        
         # イベントソースを判定
         if 'Records' in event and event['Records']:
             # S3イベント
-            return handle_s3_event(event, context, s3_client, db_manager)
+            return handle_s3_event(event, context, S3_CLIENT, DB_MANAGER)
         elif 'httpMethod' in event:
             # API Gatewayイベント - ルーティングチェック
             http_method = event.get('httpMethod', '')
             resource = event.get('resource', '')
             
             if resource == '/process' and http_method == 'POST':
-                return handle_api_request(event, context, db_manager)
+                return handle_api_request(event, context, DB_MANAGER)
             else:
                 return create_response(404, {'error': 'Resource not found'})
         else:
-            print("Unknown event type")
+            logger.warning("Unknown event type")
             return create_response(400, {'error': 'Unknown event type'})
 
-    except Exception as e:
-        print(f"Error in lambda_handler: {str(e)}")
+    except Exception:
+        logger.exception("Error in lambda_handler")
         return create_response(500, {'error': 'Internal server error'})
 
 
@@ -60,7 +67,9 @@ def handle_s3_event(event, context, s3_client, db_manager):
     """S3イベントを処理"""
     try:
         processed_records = 0
-        
+        jobs = []
+        created_at = get_current_timestamp()
+
         for record in event['Records']:
             # S3イベント情報を取得
             s3_info = record['s3']
@@ -68,55 +77,65 @@ def handle_s3_event(event, context, s3_client, db_manager):
             object_key = s3_info['object']['key']
             event_name = record['eventName']
 
-            print(f"Processing S3 event: {event_name} for {bucket_name}/{object_key}")
+            logger.debug("Processing S3 event: %s for %s/%s", event_name, bucket_name, object_key)
+
+            jobs.append({
+                'id': str(uuid.uuid4()),
+                'type': 's3_processing',
+                'bucket': bucket_name,
+                'key': object_key,
+                'created_at': created_at,
+                'event_name': event_name
+            })
 
+        # ファイル情報のHEADリクエストを並列実行
+        max_workers = min(S3_HEAD_MAX_WORKERS, max(len(jobs), 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(s3_client.head_object, Bucket=job['bucket'], Key=job['key'])
+                for job in jobs
+            ]
+
+        finished_at = get_current_timestamp()
+
+        for job, future in zip(jobs, futures):
             try:
-                # 処理ジョブを記録
-                job_id = str(uuid.uuid4())
-                job = {
-                    'id': job_id,
-                    'type': 's3_processing',
-                    'bucket': bucket_name,
-                    'key': object_key,
-                    'processing_status': 'processing',
-                    'created_at': get_current_timestamp(),
-                    'event_name': event_name
-                }
-
-                db_manager.put_item(job)
-
-                # ファイルサイズを取得
-                response = s3_client.head_object(Bucket=bucket_name, Key=object_key)
-                file_size = response['ContentLength']
-                content_type = response.get('ContentType', 'unknown')
+                response = future.result()
 
                 # 処理完了を記録
-                updates = {
+                job.update({
                     'processing_status': 'completed',
-                    'completed_at': get_current_timestamp(),
-                    'file_size': file_size,
-                    'content_type': content_type
-                }
-
-                db_manager.update_item({'id': job_id}, updates)
+                    'completed_at': finished_at,
+                    'file_size': response['ContentLength'],
+                    'content_type': response.get('ContentType', 'unknown')
+                })
                 processed_records += 1
-                
+
             except Exception as record_error:
-                print(f"Error processing record {object_key}: {str(record_error)}")
+                logger.exception("Error processing record %s", job['key'])
                 # 個別レコードのエラーは記録するが、他のレコード処理は継続
-                if 'job_id' in locals():
-                    db_manager.update_item(
-                        {'id': job_id},
-                        {'status': 'failed', 'error': str(record_error), 'failed_at': get_current_timestamp()}
-                    )
+                job.update({
+                    'processing_status': 'failed',
+                    'error': str(record_error),
+                    'failed_at': finished_at
+                })
+
+        # 処理結果をまとめて書き込み
+        unprocessed_jobs = db_manager.batch_write(jobs)
+        if unprocessed_jobs:
+            logger.error("Failed to record %d S3 processing jobs", len(unprocessed_jobs))
+            # 書き込めなかった完了ジョブは処理件数に含めない（失敗ジョブは元々数えていない）
+            processed_records -= sum(
+                1 for job in unprocessed_jobs if job.get('processing_status') == 'completed'
+            )
 
         return create_response(200, {
             'message': 'S3 event processed successfully',
             'processed_records': processed_records
         })
 
-    except Exception as e:
-        print(f"Error processing S3 event: {str(e)}")
+    except Exception:
+        logger.exception("Error processing S3 event")
         return create_response(500, {'error': 'Failed to process S3 event'})
 
 
@@ -124,6 +143,7 @@ def handle_api_request(event, context, db_manager):
     """APIリクエストを処理"""
     try:
         # リクエストボディをパース
+        raw_body = event.get('body')
         body = parse_json_body(event)
 
         # バリデーション
@@ -138,40 +158,52 @@ def handle_api_request(event, context, db_manager):
             return create_response(400, {'error': 'Data cannot be empty'})
             
         # データタイプのバリデーション
-        if data_type not in VALID_DATA_TYPES:
-            return create_response(400, {'error': f'Invalid data type. Must be one of: {", ".join(VALID_DATA_TYPES)}'})
+        if not isinstance(data_type, str) or data_type not in VALID_DATA_TYPES:
+            return create_response(400, {'error': f'Invalid data type. Must be one of: {_VALID_DATA_TYPES_STR}'})
 
         # 処理データIDを生成
         processed_id = str(uuid.uuid4())
         current_timestamp = get_current_timestamp()
         
-        # データサイズを計算
-        data_size = len(str(data))
+        # データサイズを計算（構造化データは文字列化せずリクエストボディ長で概算）
+        if isinstance(data, str):
+            data_size = len(data)
+        elif isinstance(raw_body, str):
+            data_size = len(raw_body)
+        else:
+            data_size = len(str(data))
 
         # 処理ジョブを作成（データベース記録用）
         job = {
             'id': processed_id,
             'type': 'api_processing',
-            'processing_status': 'queued',
             'created_at': current_timestamp,
             'data': data,
             'data_type': data_type,
             'metadata': body.get('metadata', {})
         }
 
-        db_manager.put_item(job)
-
         # 実際のデータ処理を実行
-        processed_result = process_data(data, data_type)
-
-        # 処理結果を更新
-        updates = {
+        try:
+            processed_result = process_data(data, data_type, current_timestamp)
+        except Exception as process_error:
+            # 処理失敗時のみ失敗状態を記録
+            job.update({
+                'processing_status': 'failed',
+                'error': str(process_error),
+                'failed_at': get_current_timestamp()
+            })
+            db_manager.put_item(job)
+            raise
+
+        # 処理結果を含めて一度だけ書き込み
+        job.update({
             'processing_status': 'completed',
             'completed_at': current_timestamp,
             'processing_result': processed_result
-        }
+        })
 
-        db_manager.update_item({'id': processed_id}, updates)
+        db_manager.put_item(job)
 
         # テストが期待するレスポンス形式
         processed_data = {
@@ -187,43 +219,43 @@ def handle_api_request(event, context, db_manager):
             'processed_data': processed_data
         })
 
-    except Exception as e:
-        print(f"Error processing API request: {str(e)}")
+    except Exception:
+        logger.exception("Error processing API request")
         return create_response(500, {'error': 'Failed to process data'})
 
 
-def process_data(data, data_type='text'):
+@singledispatch
+def process_data(data, data_type='text', timestamp=None):
     """データを処理する（サンプル実装）"""
     # 実際の処理ロジックをここに実装
     # このサンプルでは、データの文字数や単語数をカウント
-    if isinstance(data, str):
-        result = {
-            'original_length': len(data),
-            'word_count': len(data.split()),
-            'processed': True,
-            'timestamp': get_current_timestamp(),
-            'type': data_type
-        }
-    elif isinstance(data, dict):
-        result = {
-            'key_count': len(data.keys()),
-            'processed': True,
-            'timestamp': get_current_timestamp(),
-            'type': data_type
-        }
-    elif isinstance(data, list):
-        result = {
-            'item_count': len(data),
-            'processed': True,
-            'timestamp': get_current_timestamp(),
-            'type': data_type
-        }
-    else:
-        result = {
-            'data_type': type(data).__name__,
-            'processed': True,
-            'timestamp': get_current_timestamp(),
-            'type': data_type
-        }
-    
+    return _build_result({'data_type': type(data).__name__}, data_type, timestamp)
+
+
+@process_data.register(str)
+def _process_text(data, data_type='text', timestamp=None):
+    """文字列データの文字数と単語数をカウント"""
+    return _build_result({
+        'original_length': len(data),
+        'word_count': len(data.split())
+    }, data_type, timestamp)
+
+
+@process_data.register(dict)
+def _process_dict(data, data_type='text', timestamp=None):
+    """辞書データのキー数をカウント"""
+    return _build_result({'key_count': len(data)}, data_type, timestamp)
+
+
+@process_data.register(list)
+def _process_list(data, data_type='text', timestamp=None):
+    """リストデータの要素数をカウント"""
+    return _build_result({'item_count': len(data)}, data_type, timestamp)
+
+
+def _build_result(result, data_type, timestamp):
+    """データタイプ共通の処理結果フィールドを付与"""
+    result['processed'] = True
+    result['timestamp'] = timestamp if timestamp is not None else get_current_timestamp()
+    result['type'] = data_type
     return result
@@ -1,31 +1,46 @@
-import json
-import datetime
+import logging
 import os
 import sys
-import platform
+import time
 
-# Lambda Layerのパスを追加
-sys.path.insert(0, '/opt/python')
-sys.path.insert(0, '/opt/python/lib/python3.9/site-packages')
+from utils import create_response
 
-from utils import create_response, get_current_timestamp
+
+# ロガーの設定
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# 実行環境の情報（呼び出し間で変化しないため起動時に一度だけ取得）
+PYTHON_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+
+# レスポンスの固定部分（リクエストごとに組み立て直さない）
+HEALTH_INFO_TEMPLATE = {
+    "status": "healthy",
+    "version": "1.0.0",
+    "service": "health-check"
+}
+HEALTH_CHECK_HEADERS = {
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS'
+}
+
+# タイムスタンプのキャッシュ（[エポック秒, フォーマット済み文字列]）
+_timestamp_cache = [0, '']
 
 
 def lambda_handler(event, context):
     """ヘルスチェック用のエンドポイント"""
     
     try:
-        # ルーティングチェック
-        http_method = event.get('httpMethod', '')
-        resource = event.get('resource', '')
-        
-        if resource == '/health' and http_method == 'GET':
-            return handle_health_check(event, context)
-        else:
+        # ルーティングチェック（メソッドとリソースの組でハンドラーを引く）
+        handler = ROUTES.get((event.get('httpMethod', ''), event.get('resource', '')))
+        if handler is None:
             return create_response(404, {'error': 'Resource not found'})
+        return handler(event, context)
             
-    except Exception as e:
-        print(f"Error in health check: {str(e)}")
+    except Exception:
+        logger.exception("Error in health check")
         return create_response(500, {'error': 'Internal server error'})
 
 
@@ -36,36 +51,43 @@ def handle_health_check(event, context):
     uptime_ms = context.get_remaining_time_in_millis() if hasattr(context, 'get_remaining_time_in_millis') else 30000
     uptime_seconds = (300000 - uptime_ms) / 1000  # 5分のタイムアウトから逆算
     
-    # 基本的なヘルスチェック情報
-    health_info = {
-        "status": "healthy",
-        "timestamp": get_current_timestamp(),
-        "environment": os.environ.get('ENVIRONMENT', 'unknown'),
-        "version": "1.0.0",
-        "service": "health-check",
-        "uptime": f"{uptime_seconds:.2f}s"
-    }
+    # 基本的なヘルスチェック情報（固定部分をコピーして動的な項目のみ設定）
+    health_info = HEALTH_INFO_TEMPLATE.copy()
+    health_info['timestamp'] = get_health_timestamp()
+    health_info['environment'] = os.environ.get('ENVIRONMENT', 'unknown')
+    health_info['uptime'] = f"{uptime_seconds:.2f}s"
     
     # 詳細情報の要求をチェック
-    query_params = event.get('queryStringParameters', {})
-    if query_params and query_params.get('details') == 'true':
+    query_params = event.get('queryStringParameters')
+    include_details = bool(query_params) and query_params.get('details') == 'true'
+    if include_details:
         health_info['details'] = {
             'memory': {
                 'limit_mb': context.memory_limit_in_mb if hasattr(context, 'memory_limit_in_mb') else 256,
                 'unit': 'MB'
             },
             'runtime': {
-                'python_version': platform.python_version(),
+                'python_version': PYTHON_VERSION,
                 'function_name': context.function_name if hasattr(context, 'function_name') else 'unknown',
                 'function_version': context.function_version if hasattr(context, 'function_version') else 'unknown'
             },
-            'region': os.environ.get('AWS_REGION', 'us-east-1')
+            'region': AWS_REGION
         }
     
     # CORSヘッダーを含むレスポンスを作成
-    headers = {
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'GET,OPTIONS'
-    }
-    
-    return create_response(200, health_info, headers)
\ No newline at end of file
+    return create_response(200, health_info, HEALTH_CHECK_HEADERS)
+
+
+def get_health_timestamp():
+    """秒単位でキャッシュしたISO 8601形式のタイムスタンプを取得"""
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache[0] = now
+        _timestamp_cache[1] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))
+    return _timestamp_cache[1]
+
+
+# ルーティングテーブル（関数定義後に構築）
+ROUTES = {
+    ('GET', '/health'): handle_health_check
+}
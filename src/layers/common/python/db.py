@@ -1,10 +1,17 @@
+import time
 import boto3
+from itertools import islice
 from typing import Dict, Any, List, Optional
 from botocore.exceptions import ClientError
 import logging
 
 logger = logging.getLogger()
 
+# BatchWriteItemで一度に書き込める最大件数
+BATCH_WRITE_MAX_ITEMS = 25
+# UnprocessedItems再試行時のバックオフ基準秒数
+BATCH_WRITE_BASE_DELAY = 0.05
+
 
 class DynamoDBManager:
     """シンプルなDynamoDB操作を提供するクラス"""
@@ -25,6 +32,41 @@ class DynamoDBManager:
             logger.error(f"Error putting item: {e}")
             raise
 
+    def batch_write(self, items: List[Dict[str, Any]], max_retries: int = 5) -> List[Dict[str, Any]]:
+        """アイテムを25件ずつまとめて書き込み、書き込めなかったアイテムを返す"""
+        unprocessed_items = []
+        iterator = iter(items)
+
+        while True:
+            chunk = list(islice(iterator, BATCH_WRITE_MAX_ITEMS))
+            if not chunk:
+                break
+
+            request_items = {self.table_name: [{'PutRequest': {'Item': item}} for item in chunk]}
+            try:
+                for attempt in range(max_retries + 1):
+                    if attempt:
+                        # 未処理アイテムは指数バックオフで再試行
+                        time.sleep(BATCH_WRITE_BASE_DELAY * (2 ** (attempt - 1)))
+                    response = self.dynamodb.batch_write_item(RequestItems=request_items)
+                    request_items = response.get('UnprocessedItems')
+                    if not request_items:
+                        break
+            except ClientError as e:
+                logger.error(f"Error batch writing items: {e}")
+                raise
+
+            if request_items:
+                unprocessed_items.extend(
+                    request['PutRequest']['Item'] for request in request_items.get(self.table_name, [])
+                )
+
+        if unprocessed_items:
+            logger.error(f"Batch write left {len(unprocessed_items)} unprocessed items")
+        else:
+            logger.info(f"Batch write success: {len(items)} items")
+        return unprocessed_items
+
     def get_item(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """キーでアイテムを取得"""
         try:
@@ -1,30 +1,62 @@
 import json
 import logging
 import os
+import re
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+# orjsonが利用可能な場合は高速なパーサー/シリアライザーを使用（未導入の環境ではstdlibにフォールバック）
+try:
+    import orjson
+
+    # 19桁以上の数字列を含む場合は64bitを超える整数の可能性がある（orjsonはfloatに丸めるため）
+    _WIDE_INT_RE = re.compile(r'\d{19}')
+
+    def json_loads(s: str) -> Any:
+        """JSON文字列をパース（orjsonが扱えない入力はstdlibと同じ結果になるようフォールバック）"""
+        if _WIDE_INT_RE.search(s):
+            return json.loads(s)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # NaN/Infinityや対になっていないサロゲートはstdlibなら受け付ける
+            return json.loads(s)
+
+    def json_dumps(obj: Any) -> str:
+        """オブジェクトをJSON文字列に変換（API Gatewayのbodyはstrのためデコードする）"""
+        # 数値などstr以外のキーもjson.dumpsと同様に文字列キーとして出力
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except orjson.JSONEncodeError:
+            # 64bitを超える整数などorjsonが扱えない値はstdlibで出力
+            return json.dumps(obj, default=str)
+except ImportError:
+    from json import loads as json_loads
+
+    def json_dumps(obj: Any) -> str:
+        """オブジェクトをJSON文字列に変換"""
+        return json.dumps(obj, default=str)
+
 # ロガーの設定
 logger = logging.getLogger()
 logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 
-def create_response(status_code: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-    """APIレスポンスを作成する共通関数"""
-    default_headers = {
-        'Content-Type': 'application/json',
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
-    }
+# 全レスポンス共通のヘッダー（レスポンスにはコピーを渡し、この辞書自体は共有しない）
+DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+    'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
+}
 
-    if headers:
-        default_headers.update(headers)
 
+def create_response(status_code: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """APIレスポンスを作成する共通関数"""
     return {
         'statusCode': status_code,
-        'headers': default_headers,
-        'body': json.dumps(body, default=str)
+        'headers': {**DEFAULT_HEADERS, **headers} if headers else dict(DEFAULT_HEADERS),
+        'body': json_dumps(body)
     }
 
 
@@ -45,7 +77,7 @@ def parse_json_body(event: Dict[str, Any]) -> Dict[str, Any]:
     try:
         body = event.get('body', '{}')
         if isinstance(body, str):
-            return json.loads(body)
+            return json_loads(body)
         return body
     except json.JSONDecodeError:
         logger.error(f"Failed to parse JSON body: {body}")
@@ -4,6 +4,11 @@ import logging
 
 logger = logging.getLogger()
 
+# 検証用の正規表現は呼び出しごとではなくモジュール読み込み時に一度だけコンパイル
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# 電話番号（日本の形式）: ハイフンなし / ハイフンあり / 国際形式
+_PHONE_RE = re.compile(r'^(?:0\d{9,10}|0\d{1,4}-\d{1,4}-\d{4}|\+81\d{9,10})$')
+
 
 class ValidationError(Exception):
     """バリデーションエラー用のカスタム例外"""
@@ -12,8 +17,7 @@ class ValidationError(Exception):
 
 def validate_email(email: str) -> bool:
     """メールアドレスの形式を検証"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return _EMAIL_RE.match(email) is not None
 
 
 def validate_required_fields(data: Dict[str, Any], required_fields: List[str]) -> Tuple[bool, List[str]]:
@@ -41,13 +45,7 @@ def validate_string_length(value: str, min_length: int = 0, max_length: Optional
 def validate_phone_number(phone: str) -> bool:
     """電話番号の形式を検証（日本の形式）"""
     # ハイフンありなし両方に対応
-    patterns = [
-        r'^0\d{9,10}$',  # ハイフンなし
-        r'^0\d{1,4}-\d{1,4}-\d{4}$',  # ハイフンあり
-        r'^\+81\d{9,10}$'  # 国際形式
-    ]
-
-    return any(re.match(pattern, phone) for pattern in patterns)
+    return _PHONE_RE.match(phone) is not None
 
 
 def validate_user_data(user_data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
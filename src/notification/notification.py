@@ -1,29 +1,46 @@
+import json
+import logging
 import os
-import sys
 import uuid
 import boto3
 import re
-
-# Lambda Layerのパスを追加
-sys.path.insert(0, '/opt/python')
-sys.path.insert(0, '/opt/python/lib/python3.9/site-packages')
+import time
 
 from utils import (
     create_response,
     log_event,
     parse_json_body,
-    get_current_timestamp
+    get_current_timestamp,
+    json_loads
 )
 from db import DynamoDBManager
 
 
+# ロガーの設定
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
 # 環境変数
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
 NOTIFICATION_TABLE_NAME = os.environ.get('NOTIFICATION_TABLE_NAME', f"{ENVIRONMENT}-notifications")
 SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN', f"arn:aws:sns:us-east-1:123456789012:{ENVIRONMENT}-notifications")
 
 # 有効な通知タイプ
-VALID_NOTIFICATION_TYPES = ['email', 'sms']
+VALID_NOTIFICATION_TYPES = frozenset({'email', 'sms'})
+_VALID_NOTIFICATION_TYPES_STR = ', '.join(sorted(VALID_NOTIFICATION_TYPES))
+
+# PublishBatchで一度に送信できる最大件数と再試行設定
+SNS_PUBLISH_BATCH_MAX_ENTRIES = 10
+SNS_PUBLISH_MAX_RETRIES = 3
+SNS_PUBLISH_BASE_DELAY = 0.1
+
+# 受信者形式の検証パターン
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_RE = re.compile(r'^\+?[1-9]\d{1,14}$')
+
+# AWS クライアントとDBマネージャーの初期化（コールドスタート時に一度だけ実行）
+SNS_CLIENT = boto3.client('sns')
+DB_MANAGER = DynamoDBManager(NOTIFICATION_TABLE_NAME)
 
 
 def lambda_handler(event, context):
@@ -31,38 +48,33 @@ def lambda_handler(event, context):
     log_event(event, context)
 
     try:
-        # AWS クライアントとDBマネージャーの初期化
-        sns_client = boto3.client('sns')
-        ses_client = boto3.client('ses')
-        db_manager = DynamoDBManager(NOTIFICATION_TABLE_NAME)
-        
         # イベントソースを判定
         if 'Records' in event and event['Records']:
             # SNSイベント
-            return handle_sns_event(event, context, db_manager)
+            return handle_sns_event(event, context, DB_MANAGER)
         elif 'httpMethod' in event:
             # API Gatewayイベント - ルーティングチェック
             http_method = event.get('httpMethod', '')
             resource = event.get('resource', '')
             
             if resource == '/notify' and http_method == 'POST':
-                return handle_api_request(event, context, sns_client, db_manager)
+                return handle_api_request(event, context, SNS_CLIENT, DB_MANAGER)
             else:
                 return create_response(404, {'error': 'Resource not found'})
         else:
-            print("Unknown event type")
+            logger.warning("Unknown event type")
             return create_response(400, {'error': 'Unknown event type'})
 
-    except Exception as e:
-        print(f"Error in lambda_handler: {str(e)}")
+    except Exception:
+        logger.exception("Error in lambda_handler")
         return create_response(500, {'error': 'Internal server error'})
 
 
 def handle_sns_event(event, context, db_manager):
     """SNSイベントを処理"""
     try:
-        processed_records = 0
-        
+        notifications = []
+
         for record in event['Records']:
             try:
                 sns = record['Sns']
@@ -71,54 +83,49 @@ def handle_sns_event(event, context, db_manager):
                 topic_arn = sns['TopicArn']
                 message_id = sns['MessageId']
 
-                print(f"Processing SNS message from topic: {topic_arn}")
+                logger.debug("Processing SNS message from topic: %s", topic_arn)
 
                 # メッセージ内容をパース（JSON形式の場合）
                 try:
-                    import json
-                    parsed_message = json.loads(message_content)
+                    parsed_message = json_loads(message_content)
                     recipient = parsed_message.get('recipient', 'unknown')
                     notification_type = parsed_message.get('type', 'sns')
-                except:
+                except (json.JSONDecodeError, TypeError, AttributeError):
+                    # JSON以外、またはオブジェクト以外のJSONはプレーンテキストとして扱う
                     recipient = 'unknown'
                     notification_type = 'sns'
 
-                # 通知を記録
-                notification_id = str(uuid.uuid4())
-                notification = {
-                    'id': notification_id,
+                # 処理済みの通知を作成（書き込みは後でまとめて行う）
+                now = get_current_timestamp()
+                notifications.append({
+                    'id': str(uuid.uuid4()),
                     'type': notification_type,
                     'source': 'sns',
                     'topic_arn': topic_arn,
                     'recipient': recipient,
                     'subject': subject,
                     'message': message_content,
-                    'notification_status': 'received',
-                    'created_at': get_current_timestamp(),
+                    'notification_status': 'processed',
+                    'created_at': now,
+                    'processed_at': now,
                     'sns_message_id': message_id
-                }
+                })
 
-                db_manager.put_item(notification)
-
-                # 処理完了を記録
-                db_manager.update_item(
-                    {'id': notification_id},
-                    {'notification_status': 'processed', 'processed_at': get_current_timestamp()}
-                )
-                
-                processed_records += 1
-                
-            except Exception as record_error:
-                print(f"Error processing SNS record: {str(record_error)}")
+            except Exception:
+                logger.exception("Error processing SNS record")
                 # 個別レコードのエラーは記録するが、他のレコード処理は継続
 
+        # 通知をまとめて書き込み
+        unprocessed_notifications = db_manager.batch_write(notifications)
+        processed_records = len(notifications) - len(unprocessed_notifications)
+
         return create_response(200, {
             'message': 'SNS event processed successfully',
             'processed_records': processed_records
         })
 
-    except Exception as e:
-        print(f"Error processing SNS event: {str(e)}")
+    except Exception:
+        logger.exception("Error processing SNS event")
         return create_response(500, {'error': 'Failed to process SNS event'})
 
 
@@ -147,7 +154,7 @@ def handle_api_request(event, context, sns_client, db_manager):
             
         # 通知タイプの検証
         if notification_type not in VALID_NOTIFICATION_TYPES:
-            return create_response(400, {'error': f'Invalid type. Must be one of: {", ".join(VALID_NOTIFICATION_TYPES)}'})
+            return create_response(400, {'error': f'Invalid type. Must be one of: {_VALID_NOTIFICATION_TYPES_STR}'})
 
         # 受信者の形式検証
         if notification_type == 'email':
@@ -170,7 +177,7 @@ def handle_api_request(event, context, sns_client, db_manager):
             
             notification_status = 'sent' if send_result.get('success', False) else 'failed'
         except Exception as send_error:
-            print(f"Error sending notification: {str(send_error)}")
+            logger.exception("Error sending notification")
             notification_status = 'failed'
             send_result = {'success': False, 'error': str(send_error)}
 
@@ -210,8 +217,8 @@ def handle_api_request(event, context, sns_client, db_manager):
             'notification': notification_response
         })
 
-    except Exception as e:
-        print(f"Error handling API request: {str(e)}")
+    except Exception:
+        logger.exception("Error handling API request")
         return create_response(500, {'error': 'Failed to send notification'})
 
 
@@ -242,7 +249,7 @@ def send_email_notification(recipient, subject, message, sns_client):
         }
 
     except Exception as e:
-        print(f"Error sending email: {str(e)}")
+        logger.exception("Error sending email")
         return {
             'success': False,
             'error': str(e)
@@ -274,20 +281,93 @@ def send_sms_notification(phone_number, message, sns_client):
         }
 
     except Exception as e:
-        print(f"Error sending SMS: {str(e)}")
+        logger.exception("Error sending SMS")
         return {
             'success': False,
             'error': str(e)
         }
 
 
+def send_notifications_batch(items, sns_client):
+    """複数の通知をPublishBatchでまとめて送信（結果は入力と同じ順序で返す）"""
+    results = [None] * len(items)
+
+    for start in range(0, len(items), SNS_PUBLISH_BATCH_MAX_ENTRIES):
+        end = min(start + SNS_PUBLISH_BATCH_MAX_ENTRIES, len(items))
+        pending = {str(index): build_batch_entry(str(index), items[index]) for index in range(start, end)}
+
+        for attempt in range(SNS_PUBLISH_MAX_RETRIES + 1):
+            if attempt:
+                # 失敗したエントリは指数バックオフで再試行
+                time.sleep(SNS_PUBLISH_BASE_DELAY * (2 ** (attempt - 1)))
+
+            try:
+                response = sns_client.publish_batch(
+                    TopicArn=SNS_TOPIC_ARN,
+                    PublishBatchRequestEntries=list(pending.values())
+                )
+            except Exception as e:
+                logger.exception("Error sending notification batch")
+                for entry_id in pending:
+                    results[int(entry_id)] = {'success': False, 'error': str(e)}
+                break
+
+            for successful in response.get('Successful', []):
+                results[int(successful['Id'])] = {'success': True, 'message_id': successful['MessageId']}
+
+            retry_entries = {}
+            for failed in response.get('Failed', []):
+                results[int(failed['Id'])] = {'success': False, 'error': failed.get('Message', failed['Code'])}
+                # 送信側の問題（SenderFault）は再試行しても成功しないため除外
+                if not failed.get('SenderFault', False):
+                    retry_entries[failed['Id']] = pending[failed['Id']]
+
+            pending = retry_entries
+            if not pending:
+                break
+
+        # SuccessfulにもFailedにも含まれなかったエントリは失敗として扱う
+        for index in range(start, end):
+            if results[index] is None:
+                results[index] = {'success': False, 'error': 'No result returned by PublishBatch'}
+
+    return results
+
+
+def build_batch_entry(entry_id, item):
+    """PublishBatch用のエントリを作成"""
+    entry = {
+        'Id': entry_id,
+        'Message': item['message'],
+        'MessageAttributes': {
+            'notification_type': {
+                'DataType': 'String',
+                'StringValue': item['type']
+            },
+            'recipient': {
+                'DataType': 'String',
+                'StringValue': item['recipient']
+            }
+        }
+    }
+
+    if item['type'] == 'email':
+        entry['Subject'] = item.get('subject') or 'Notification'
+
+    return entry
+
+
 def is_valid_email(email):
     """メールアドレス形式の検証"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    # 明らかに不正な入力は正規表現を使わずに除外
+    if '@' not in email or len(email) > 254:
+        return False
+    return _EMAIL_RE.match(email) is not None
 
 
 def is_valid_phone(phone):
     """電話番号形式の検証（国際形式）"""
-    pattern = r'^\+?[1-9]\d{1,14}$'
-    return re.match(pattern, phone) is not None
\ No newline at end of file
+    # E.164は「+」を含めて最大16文字
+    if not (2 <= len(phone) <= 16):
+        return False
+    return _PHONE_RE.match(phone) is not None
\ No newline at end of file
@@ -1,11 +1,7 @@
+import logging
 import os
-import sys
 import uuid
 
-# Lambda Layerのパスを追加
-sys.path.insert(0, '/opt/python')
-sys.path.insert(0, '/opt/python/lib/python3.9/site-packages')
-
 from utils import (
     create_response,
     log_event,
@@ -18,6 +14,10 @@ from db import DynamoDBManager
 from validators import validate_user_data
 
 
+# ロガーの設定
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
 # 環境変数から設定を取得
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
 USER_TABLE_NAME = os.environ.get('USER_TABLE_NAME', f"{ENVIRONMENT}-users")
@@ -44,8 +44,8 @@ def lambda_handler(event, context):
         else:
             return create_response(404, {'error': 'Resource not found'})
 
-    except Exception as e:
-        print(f"Error in lambda_handler: {str(e)}")
+    except Exception:
+        logger.exception("Error in lambda_handler")
         return create_response(500, {'error': 'Internal server error'})
 
 
@@ -84,8 +84,8 @@ def create_user(event, db_manager):
             'user': user
         })
 
-    except Exception as e:
-        print(f"Error creating user: {str(e)}")
+    except Exception:
+        logger.exception("Error creating user")
         return create_response(500, {'error': 'Failed to create user'})
 
 
@@ -104,8 +104,8 @@ def get_user(event, db_manager):
 
         return create_response(200, {'user': user})
 
-    except Exception as e:
-        print(f"Error getting user: {str(e)}")
+    except Exception:
+        logger.exception("Error getting user")
         return create_response(500, {'error': 'Failed to get user'})
 
 
@@ -125,6 +125,6 @@ def list_users(event, db_manager):
             'count': len(users)
         })
 
-    except Exception as e:
-        print(f"Error listing users: {str(e)}")
+    except Exception:
+        logger.exception("Error listing users")
         return create_response(500, {'error': 'Failed to list users'})
@@ -1,24 +1,186 @@
+import functools
+import os
+import sys
+import types
 import pytest
 import boto3
+from botocore.config import Config
 from moto import mock_aws
 
+# Lambda function sources and the common layer
+SRC_DIR = os.path.join(os.path.dirname(__file__), '../../src')
+LAYER_DIR = os.path.join(SRC_DIR, 'layers/common/python')
 
-@pytest.fixture(scope='function')
-@mock_aws
-def dynamodb_resource():
+# Environment shared by every test module, set once before any handler is imported
+os.environ.setdefault('ENVIRONMENT', 'test')
+os.environ.setdefault('LOG_LEVEL', 'DEBUG')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+# moto never throttles, so botocore retries (in handler clients too) are pure overhead
+os.environ.setdefault('AWS_MAX_ATTEMPTS', '1')
+
+# Directories holding the handler modules and the layer, put on sys.path once in pytest_configure
+SOURCE_DIRS = [
+    os.path.join(SRC_DIR, name)
+    for name in ('user_management', 'data_processor', 'notification', 'health_check')
+] + [LAYER_DIR]
+
+
+def pytest_configure(config):
+    """Expose the Lambda sources and load moto's service backends up front"""
+    for path in SOURCE_DIRS:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    import moto.dynamodb.models
+    import moto.s3.models
+    import moto.sns.models
+
+
+@pytest.fixture(scope='session')
+def aws_credentials():
+    """Mocked AWS credentials for moto"""
+    os.environ.update({
+        'AWS_ACCESS_KEY_ID': 'testing',
+        'AWS_SECRET_ACCESS_KEY': 'testing',
+        'AWS_SECURITY_TOKEN': 'testing',
+        'AWS_SESSION_TOKEN': 'testing',
+        'AWS_DEFAULT_REGION': 'us-east-1'
+    })
+
+
+@pytest.fixture(scope='module')
+def mocked_aws(aws_credentials):
+    """Keep a single moto mock active for the whole test module"""
+    with mock_aws():
+        yield
+
+
+@pytest.fixture(scope='session')
+def lambda_context():
+    """Lambda context stand-in shared by the session (handlers only read it)"""
+    return types.SimpleNamespace(
+        request_id='test-request-id',
+        function_name='test-function',
+        function_version='$LATEST',
+        invoked_function_arn='arn:aws:lambda:us-east-1:123456789012:function:test-function',
+        memory_limit_in_mb=512,
+        get_remaining_time_in_millis=lambda: 30000
+    )
+
+
+# Fixture clients only send hand-written setup calls, so skip botocore's parameter validation
+_CLIENT_CONFIG = Config(parameter_validation=False, retries={'total_max_attempts': 1, 'mode': 'standard'})
+
+
+@functools.lru_cache(maxsize=None)
+def _session():
+    """Single boto3 session with explicit dummy credentials, skipping the credential provider chain"""
+    return boto3.Session(
+        aws_access_key_id='testing',
+        aws_secret_access_key='testing',
+        aws_session_token='testing',
+        region_name='us-east-1'
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _resource(service_name):
+    """Build a boto3 resource once per process; moto intercepts its calls under any active mock"""
+    return _session().resource(service_name, config=_CLIENT_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def _client(service_name):
+    """Build a boto3 client once per process; moto intercepts its calls under any active mock"""
+    return _session().client(service_name, config=_CLIENT_CONFIG)
+
+
+@pytest.fixture(scope='module')
+def dynamodb_resource(mocked_aws):
     """Create a mock DynamoDB resource"""
-    return boto3.resource('dynamodb', region_name='us-east-1')
+    return _resource('dynamodb')
+
 
+@pytest.fixture(scope='module')
+def create_table(dynamodb_resource):
+    """Factory creating an on-demand table keyed by a string `id` under the module's moto mock"""
+    # moto creates the table synchronously as ACTIVE, so no table_exists waiter is needed
+    def _create_table(name):
+        return dynamodb_resource.create_table(
+            TableName=name,
+            KeySchema=[
+                {
+                    'AttributeName': 'id',
+                    'KeyType': 'HASH'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'id',
+                    'AttributeType': 'S'
+                }
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+    return _create_table
 
-@pytest.fixture(scope='function')
-@mock_aws  
-def s3_client():
+
+@pytest.fixture(scope='session')
+def truncate_table():
+    """Helper deleting every item of an `id`-keyed table through the regular API"""
+    def _truncate_table(table):
+        items = table.scan(ProjectionExpression='id')['Items']
+        with table.batch_writer() as batch:
+            for item in items:
+                batch.delete_item(Key={'id': item['id']})
+        return table
+    return _truncate_table
+
+
+@pytest.fixture(scope='module')
+def s3_client(mocked_aws):
     """Create a mock S3 client"""
-    return boto3.client('s3', region_name='us-east-1')
+    return _client('s3')
 
 
-@pytest.fixture(scope='function')
-@mock_aws
-def sns_client():
+@pytest.fixture(scope='module')
+def sns_client(mocked_aws):
     """Create a mock SNS client"""
-    return boto3.client('sns', region_name='us-east-1')
\ No newline at end of file
+    return _client('sns')
+
+
+# Handler modules build their boto3 clients at import time. moto intercepts at request time,
+# so each module is imported once per worker (after its env vars are set) and reused under
+# every module's mock; --dist=loadfile keeps that import to one per worker and file group.
+@pytest.fixture(scope='session')
+def user_management(aws_credentials):
+    """Import the user management module once per session"""
+    os.environ['USER_TABLE_NAME'] = 'test-users'
+
+    import user_management as module
+    return module
+
+
+@pytest.fixture(scope='session')
+def data_processor(aws_credentials):
+    """Import the data processor module once per session"""
+    os.environ.update({
+        'PROCESSED_DATA_TABLE_NAME': 'test-processed-data',
+        'DATA_BUCKET_NAME': 'test-data-bucket'
+    })
+
+    import data_processor as module
+    return module
+
+
+@pytest.fixture(scope='session')
+def notification(aws_credentials):
+    """Import the notification module once per session"""
+    os.environ.update({
+        'NOTIFICATION_TABLE_NAME': 'test-notifications',
+        'SNS_TOPIC_ARN': 'arn:aws:sns:us-east-1:123456789012:test-notifications'
+    })
+
+    import notification as module
+    return module
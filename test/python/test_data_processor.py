@@ -1,108 +1,91 @@
-import unittest
 import json
-import os
-import uuid
-from unittest.mock import Mock, patch
-import boto3
-from moto import mock_aws
-
-# Set environment variables before importing the module
-os.environ['ENVIRONMENT'] = 'test'
-os.environ['LOG_LEVEL'] = 'DEBUG'
-os.environ['PROCESSED_DATA_TABLE_NAME'] = 'test-processed-data'
-os.environ['DATA_BUCKET_NAME'] = 'test-data-bucket'
-os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
-
-# Add source path
-import sys
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src/data_processor'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src/layers/common/python'))
-
-# Import the module to test
-import data_processor
-
-
-@mock_aws
-class TestDataProcessor(unittest.TestCase):
+import orjson
+import types
+from unittest.mock import patch
+import pytest
+
+# Static request bodies, serialized once at import
+_API_BODY_VALID = json.dumps({'data': 'test data content', 'type': 'text', 'metadata': {'source': 'api'}})
+_API_BODY_INVALID = json.dumps({'data': '', 'type': 'unknown'})  # Empty data, invalid type
+_API_BODY_DATA_ONLY = json.dumps({'data': 'test'})
+_API_BODY_TEXT = json.dumps({'data': 'test data', 'type': 'text'})
+_API_BODY_INVALID_TYPE = json.dumps({'data': 'content', 'type': 'invalid_type'})
+_API_BODY_LIST_TYPE = json.dumps({'data': 'content', 'type': ['text']})
+_API_BODY_LARGE = '{"data": "' + 'x' * 10000 + '", "type": "text", "metadata": {"size": "large"}}'  # 10KB of data
+
+# Objects present in the test bucket for every S3 event test
+S3_TEST_OBJECTS = {
+    'uploads/test-file.txt': b'Test file content',
+    'uploads/file1.txt': b'File 1',
+    'uploads/file2.txt': b'File 2',
+    'uploads/exists.txt': b'Exists'
+}
+
+
+@pytest.fixture(scope='module')
+def aws_env(create_table, s3_client):
+    """Create the data processor table and bucket under the module's moto mock"""
+    table = create_table('test-processed-data')
+    s3_client.create_bucket(Bucket='test-data-bucket')
+
+    return types.SimpleNamespace(table=table, s3=s3_client)
+
+
+@pytest.fixture(scope='module')
+def s3_bucket(aws_env):
+    """Upload the S3 objects the tests read once for the module"""
+    # The handler only reads these objects, so the tests never modify them
+    for key, content in S3_TEST_OBJECTS.items():
+        aws_env.s3.put_object(Bucket='test-data-bucket', Key=key, Body=content)
+    return 'test-data-bucket'
+
+
+@pytest.fixture
+def dynamodb_table(aws_env, truncate_table):
+    """Shared processed data table, emptied before each test"""
+    return truncate_table(aws_env.table)
+
+
+class TestDataProcessor:
     """Test cases for Data Processor Lambda function"""
 
-    def setUp(self):
-        """Set up test fixtures before each test method"""
-        # Create mock DynamoDB table
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        self.table = self.dynamodb.create_table(
-            TableName='test-processed-data',
-            KeySchema=[
-                {
-                    'AttributeName': 'id',
-                    'KeyType': 'HASH'
-                }
-            ],
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'id',
-                    'AttributeType': 'S'
-                }
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Wait for table to be created
-        self.table.wait_until_exists()
-        
-        # Create mock S3 bucket
-        self.s3_client = boto3.client('s3', region_name='us-east-1')
-        self.s3_client.create_bucket(Bucket='test-data-bucket')
-        
-        # Create mock Lambda context
-        self.lambda_context = Mock()
-        self.lambda_context.request_id = 'test-request-id'
-        self.lambda_context.function_name = 'test-data-processor'
-        self.lambda_context.function_version = '$LATEST'
-        self.lambda_context.invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:test-data-processor'
-        self.lambda_context.memory_limit_in_mb = 512
-        self.lambda_context.get_remaining_time_in_millis = Mock(return_value=30000)
-
-    def test_process_data_api_success(self):
-        """Test successful data processing via API"""
+    def test_process_data_api_success(self, data_processor, dynamodb_table, lambda_context):
+        """Test successful data processing via API, including CORS headers and timestamps"""
         event = {
             'httpMethod': 'POST',
             'resource': '/process',
-            'body': json.dumps({
-                'data': 'test data content',
-                'type': 'text',
-                'metadata': {'source': 'api'}
-            })
+            'body': _API_BODY_VALID
         }
 
-        response = data_processor.lambda_handler(event, self.lambda_context)
+        with patch.object(data_processor, 'get_current_timestamp', return_value='2023-01-01T12:00:00Z') as mock_timestamp:
+            response = data_processor.lambda_handler(event, lambda_context)
         
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['message'], 'Data processed successfully')
-        self.assertIn('processed_data', body)
-        self.assertEqual(body['processed_data']['type'], 'text')
-        self.assertEqual(body['processed_data']['status'], 'processed')
-        self.assertIn('id', body['processed_data'])
-
-    def test_process_data_api_invalid_data(self):
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['message'] == 'Data processed successfully'
+        assert 'processed_data' in body
+        assert body['processed_data']['type'] == 'text'
+        assert body['processed_data']['status'] == 'processed'
+        assert 'id' in body['processed_data']
+        assert body['processed_data']['processed_at'] == '2023-01-01T12:00:00Z'
+        assert mock_timestamp.call_count >= 1
+        assert response['headers']['Access-Control-Allow-Origin'] == '*'
+
+    def test_process_data_api_invalid_data(self, data_processor, lambda_context):
         """Test data processing with invalid data"""
         event = {
             'httpMethod': 'POST',
             'resource': '/process',
-            'body': json.dumps({
-                'data': '',  # Empty data
-                'type': 'unknown'  # Invalid type
-            })
+            'body': _API_BODY_INVALID
         }
 
-        response = data_processor.lambda_handler(event, self.lambda_context)
+        response = data_processor.lambda_handler(event, lambda_context)
         
-        self.assertEqual(response['statusCode'], 400)
-        body = json.loads(response['body'])
-        self.assertIn('error', body)
+        assert response['statusCode'] == 400
+        body = orjson.loads(response['body'])
+        assert 'error' in body
 
-    def test_s3_event_processing(self):
+    def test_s3_event_processing(self, data_processor, dynamodb_table, s3_bucket, lambda_context):
         """Test S3 event processing"""
         # Create S3 event
         s3_event = {
@@ -123,22 +106,15 @@ class TestDataProcessor(unittest.TestCase):
             ]
         }
 
-        # Put test object in S3
-        self.s3_client.put_object(
-            Bucket='test-data-bucket',
-            Key='uploads/test-file.txt',
-            Body=b'Test file content'
-        )
-
-        response = data_processor.lambda_handler(s3_event, self.lambda_context)
+        response = data_processor.lambda_handler(s3_event, lambda_context)
         
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['message'], 'S3 event processed successfully')
-        self.assertIn('processed_records', body)
-        self.assertEqual(body['processed_records'], 1)
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['message'] == 'S3 event processed successfully'
+        assert 'processed_records' in body
+        assert body['processed_records'] == 1
 
-    def test_s3_event_processing_error(self):
+    def test_s3_event_processing_error(self, data_processor, dynamodb_table, lambda_context):
         """Test S3 event processing with non-existent object"""
         s3_event = {
             'Records': [
@@ -158,26 +134,32 @@ class TestDataProcessor(unittest.TestCase):
             ]
         }
 
-        response = data_processor.lambda_handler(s3_event, self.lambda_context)
+        response = data_processor.lambda_handler(s3_event, lambda_context)
         
         # Should handle error gracefully
-        self.assertIn(response['statusCode'], [200, 500])
+        assert response['statusCode'] in [200, 500]
+
+        # The failed record is written once with its final status
+        items = dynamodb_table.scan()['Items']
+        assert len(items) == 1
+        assert items[0]['processing_status'] == 'failed'
+        assert 'failed_at' in items[0]
 
-    def test_invalid_request_method(self):
+    def test_invalid_request_method(self, data_processor, lambda_context):
         """Test invalid HTTP method"""
         event = {
             'httpMethod': 'DELETE',
             'resource': '/process',
-            'body': json.dumps({'data': 'test'})
+            'body': _API_BODY_DATA_ONLY
         }
 
-        response = data_processor.lambda_handler(event, self.lambda_context)
+        response = data_processor.lambda_handler(event, lambda_context)
         
-        self.assertEqual(response['statusCode'], 404)
-        body = json.loads(response['body'])
-        self.assertEqual(body['error'], 'Resource not found')
+        assert response['statusCode'] == 404
+        body = orjson.loads(response['body'])
+        assert body['error'] == 'Resource not found'
 
-    def test_missing_body(self):
+    def test_missing_body(self, data_processor, lambda_context):
         """Test API request with missing body"""
         event = {
             'httpMethod': 'POST',
@@ -185,119 +167,61 @@ class TestDataProcessor(unittest.TestCase):
             'body': None
         }
 
-        response = data_processor.lambda_handler(event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 400)
-        body = json.loads(response['body'])
-        self.assertIn('error', body)
-
-    def test_data_validation(self):
-        """Test data validation logic"""
-        # Test with valid data
-        valid_data = {
-            'data': 'valid content',
-            'type': 'text',
-            'metadata': {'source': 'test'}
-        }
-        
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/process',
-            'body': json.dumps(valid_data)
-        }
-
-        response = data_processor.lambda_handler(event, self.lambda_context)
-        self.assertEqual(response['statusCode'], 200)
-
-        # Test with invalid data type
-        invalid_data = {
-            'data': 'content',
-            'type': 'invalid_type'
-        }
+        response = data_processor.lambda_handler(event, lambda_context)
         
-        event['body'] = json.dumps(invalid_data)
-        response = data_processor.lambda_handler(event, self.lambda_context)
-        self.assertEqual(response['statusCode'], 400)
-
-    def test_cors_headers(self):
-        """Test CORS headers in response"""
+        assert response['statusCode'] == 400
+        body = orjson.loads(response['body'])
+        assert 'error' in body
+
+    @pytest.mark.parametrize('body', [
+        pytest.param(_API_BODY_INVALID_TYPE, id='unknown-type'),
+        pytest.param(_API_BODY_LIST_TYPE, id='unhashable-type')
+    ])
+    def test_invalid_data_type(self, data_processor, lambda_context, body):
+        """Test data validation with an unsupported data type"""
         event = {
             'httpMethod': 'POST',
             'resource': '/process',
-            'body': json.dumps({
-                'data': 'test data',
-                'type': 'text'
-            })
+            'body': body
         }
 
-        response = data_processor.lambda_handler(event, self.lambda_context)
-        
-        self.assertIn('headers', response)
-        headers = response['headers']
-        self.assertIn('Access-Control-Allow-Origin', headers)
-        self.assertEqual(headers['Access-Control-Allow-Origin'], '*')
+        response = data_processor.lambda_handler(event, lambda_context)
+        assert response['statusCode'] == 400
+        assert orjson.loads(response['body'])['error'] == (
+            'Invalid data type. Must be one of: text, json, csv, xml, binary'
+        )
 
-    def test_exception_handling(self):
+    def test_exception_handling(self, data_processor, lambda_context):
         """Test exception handling when DynamoDB is unavailable"""
-        with patch('data_processor.DynamoDBManager.put_item', side_effect=Exception('Database error')):
+        with patch.object(data_processor.DB_MANAGER, 'put_item', side_effect=Exception('Database error')):
             event = {
                 'httpMethod': 'POST',
                 'resource': '/process',
-                'body': json.dumps({
-                    'data': 'test data',
-                    'type': 'text'
-                })
+                'body': _API_BODY_TEXT
             }
 
-            response = data_processor.lambda_handler(event, self.lambda_context)
+            response = data_processor.lambda_handler(event, lambda_context)
             
-            self.assertEqual(response['statusCode'], 500)
-            body = json.loads(response['body'])
-            self.assertEqual(body['error'], 'Failed to process data')
-
-    @patch('data_processor.get_current_timestamp')
-    def test_timestamp_generation(self, mock_timestamp):
-        """Test timestamp generation in data processing"""
-        mock_timestamp.return_value = '2023-01-01T12:00:00Z'
-        
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/process',
-            'body': json.dumps({
-                'data': 'test data',
-                'type': 'text'
-            })
-        }
-
-        response = data_processor.lambda_handler(event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['processed_data']['processed_at'], '2023-01-01T12:00:00Z')
-        self.assertGreaterEqual(mock_timestamp.call_count, 1)
+            assert response['statusCode'] == 500
+            body = orjson.loads(response['body'])
+            assert body['error'] == 'Failed to process data'
 
-    def test_large_data_processing(self):
+    def test_large_data_processing(self, data_processor, dynamodb_table, lambda_context):
         """Test processing of large data"""
-        large_data = 'x' * 10000  # 10KB of data
-        
         event = {
             'httpMethod': 'POST',
             'resource': '/process',
-            'body': json.dumps({
-                'data': large_data,
-                'type': 'text',
-                'metadata': {'size': 'large'}
-            })
+            'body': _API_BODY_LARGE
         }
 
-        response = data_processor.lambda_handler(event, self.lambda_context)
+        response = data_processor.lambda_handler(event, lambda_context)
         
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['message'], 'Data processed successfully')
-        self.assertEqual(body['processed_data']['size'], len(large_data))
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['message'] == 'Data processed successfully'
+        assert body['processed_data']['size'] == 10000
 
-    def test_multiple_s3_records(self):
+    def test_multiple_s3_records(self, data_processor, dynamodb_table, s3_bucket, lambda_context):
         """Test processing multiple S3 records in one event"""
         s3_event = {
             'Records': [
@@ -320,16 +244,69 @@ class TestDataProcessor(unittest.TestCase):
             ]
         }
 
-        # Put test objects in S3
-        self.s3_client.put_object(Bucket='test-data-bucket', Key='uploads/file1.txt', Body=b'File 1')
-        self.s3_client.put_object(Bucket='test-data-bucket', Key='uploads/file2.txt', Body=b'File 2')
-
-        response = data_processor.lambda_handler(s3_event, self.lambda_context)
+        response = data_processor.lambda_handler(s3_event, lambda_context)
         
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['processed_records'], 2)
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['processed_records'] == 2
+
+        # Both jobs are recorded with their final status
+        items = dynamodb_table.scan()['Items']
+        assert len(items) == 2
+        assert all(item['processing_status'] == 'completed' for item in items)
+
+    def test_s3_event_partial_failure(self, data_processor, dynamodb_table, s3_bucket, lambda_context):
+        """Test that a failing record does not affect the status of other records"""
+        s3_event = {
+            'Records': [
+                {
+                    'eventSource': 'aws:s3',
+                    'eventName': 'ObjectCreated:Put',
+                    's3': {
+                        'bucket': {'name': 'test-data-bucket'},
+                        'object': {'key': 'uploads/exists.txt', 'size': 1024}
+                    }
+                },
+                {
+                    'eventSource': 'aws:s3',
+                    'eventName': 'ObjectCreated:Put',
+                    's3': {
+                        'bucket': {'name': 'test-data-bucket'},
+                        'object': {'key': 'uploads/missing.txt', 'size': 1024}
+                    }
+                }
+            ]
+        }
+
+        response = data_processor.lambda_handler(s3_event, lambda_context)
+
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['processed_records'] == 1
+
+        statuses = {item['key']: item['processing_status'] for item in dynamodb_table.scan()['Items']}
+        assert statuses == {'uploads/exists.txt': 'completed', 'uploads/missing.txt': 'failed'}
+
+    def test_s3_event_unprocessed_writes(self, data_processor, s3_bucket, lambda_context):
+        """Test that jobs left unprocessed by the batch write are not counted as processed"""
+        s3_event = {
+            'Records': [
+                {
+                    'eventSource': 'aws:s3',
+                    'eventName': 'ObjectCreated:Put',
+                    's3': {
+                        'bucket': {'name': 'test-data-bucket'},
+                        'object': {'key': key, 'size': 1024}
+                    }
+                }
+                for key in ('uploads/file1.txt', 'uploads/file2.txt', 'uploads/missing.txt')
+            ]
+        }
 
+        # The first completed job and the failed job are returned as unprocessed
+        with patch.object(data_processor.DB_MANAGER, 'batch_write', side_effect=lambda jobs: [jobs[0], jobs[2]]):
+            response = data_processor.lambda_handler(s3_event, lambda_context)
 
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['processed_records'] == 1
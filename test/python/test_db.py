@@ -0,0 +1,71 @@
+from unittest.mock import patch
+import pytest
+from botocore.stub import Stubber
+
+import db
+
+
+def put_requests(*ids):
+    """Build the PutRequest list the resource passes to BatchWriteItem for the given ids"""
+    return [{'PutRequest': {'Item': {'id': item_id}}} for item_id in ids]
+
+
+def unprocessed_response(*ids):
+    """Build a wire-format BatchWriteItem response leaving the given ids unprocessed"""
+    requests = [{'PutRequest': {'Item': {'id': {'S': item_id}}}} for item_id in ids]
+    return {'UnprocessedItems': {'test-table': requests} if requests else {}}
+
+
+@pytest.fixture
+def manager(aws_credentials):
+    """DynamoDBManager whose low-level client is stubbed"""
+    manager = db.DynamoDBManager('test-table')
+    with Stubber(manager.dynamodb.meta.client) as stubber:
+        manager.stubber = stubber
+        yield manager
+        stubber.assert_no_pending_responses()
+
+
+class TestDynamoDBManager:
+    """Test cases for the common layer DynamoDB manager"""
+
+    def test_batch_write_retries_unprocessed_items(self, manager):
+        """Test that unprocessed items are re-sent and the write succeeds once they are accepted"""
+        manager.stubber.add_response(
+            'batch_write_item',
+            unprocessed_response('b'),
+            {'RequestItems': {'test-table': put_requests('a', 'b')}}
+        )
+        manager.stubber.add_response(
+            'batch_write_item',
+            unprocessed_response(),
+            {'RequestItems': {'test-table': put_requests('b')}}
+        )
+
+        with patch.object(db.time, 'sleep') as mock_sleep:
+            unprocessed = manager.batch_write([{'id': 'a'}, {'id': 'b'}])
+
+        assert unprocessed == []
+        mock_sleep.assert_called_once_with(db.BATCH_WRITE_BASE_DELAY)
+
+    def test_batch_write_returns_leftovers_after_max_retries(self, manager):
+        """Test that items still unprocessed after max_retries are returned to the caller"""
+        manager.stubber.add_response(
+            'batch_write_item',
+            unprocessed_response('b'),
+            {'RequestItems': {'test-table': put_requests('a', 'b')}}
+        )
+        for _ in range(2):
+            manager.stubber.add_response(
+                'batch_write_item',
+                unprocessed_response('b'),
+                {'RequestItems': {'test-table': put_requests('b')}}
+            )
+
+        with patch.object(db.time, 'sleep') as mock_sleep:
+            unprocessed = manager.batch_write([{'id': 'a'}, {'id': 'b'}], max_retries=2)
+
+        assert unprocessed == [{'id': 'b'}]
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [
+            db.BATCH_WRITE_BASE_DELAY, db.BATCH_WRITE_BASE_DELAY * 2
+        ]
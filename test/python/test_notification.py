@@ -1,384 +1,265 @@
-import unittest
-import json
-import os
-import uuid
+import orjson
 from unittest.mock import Mock, patch
-import boto3
-from moto import mock_aws
-
-# Set environment variables before importing the module
-os.environ['ENVIRONMENT'] = 'test'
-os.environ['LOG_LEVEL'] = 'DEBUG'
-os.environ['NOTIFICATION_TABLE_NAME'] = 'test-notifications'
-os.environ['SNS_TOPIC_ARN'] = 'arn:aws:sns:us-east-1:123456789012:test-notifications'
-os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+import pytest
+from botocore.stub import Stubber
+
+
+def make_api_event(body, method='POST'):
+    """Build a /notify API Gateway event; dict bodies are serialized, strings and None are used as-is"""
+    return {
+        'httpMethod': method,
+        'resource': '/notify',
+        'body': orjson.dumps(body).decode() if isinstance(body, dict) else body
+    }
+
+
+# Request events shared by the tests, with bodies serialized once at import
+EMAIL_EVENT = make_api_event({'recipient': 'test@example.com', 'message': 'Test message', 'type': 'email'})
+SUBJECT_EMAIL_EVENT = make_api_event({
+    'recipient': 'test@example.com',
+    'message': 'Test notification message',
+    'type': 'email',
+    'subject': 'Test Subject'
+})
+GET_EVENT = make_api_event({'recipient': 'test@example.com', 'message': 'test'}, method='GET')
+
+
+def make_sns_event(n, base_recipient='user{}@example.com'):
+    """Build an SNS event with n email notification records"""
+    return {
+        'Records': [
+            {
+                'EventSource': 'aws:sns',
+                'Sns': {
+                    'TopicArn': 'arn:aws:sns:us-east-1:123456789012:test-notifications',
+                    'Message': orjson.dumps({
+                        'recipient': base_recipient.format(i),
+                        'message': f'Message {i}',
+                        'type': 'email'
+                    }).decode(),
+                    'Subject': 'Test SNS Notification',
+                    'MessageId': f'message-{i}'
+                }
+            }
+            for i in range(n)
+        ]
+    }
 
-# Add source path
-import sys
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src/notification'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src/layers/common/python'))
 
-# Import the module to test
-import notification
+@pytest.fixture(scope='module')
+def notification_table(create_table):
+    """Create the notifications table once under the module's moto mock"""
+    return create_table('test-notifications')
 
 
-@mock_aws
-class TestNotification(unittest.TestCase):
-    """Test cases for Notification Lambda function"""
-
-    def setUp(self):
-        """Set up test fixtures before each test method"""
-        # Create mock DynamoDB table
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        self.table = self.dynamodb.create_table(
-            TableName='test-notifications',
-            KeySchema=[
-                {
-                    'AttributeName': 'id',
-                    'KeyType': 'HASH'
-                }
-            ],
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'id',
-                    'AttributeType': 'S'
-                }
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Wait for table to be created
-        self.table.wait_until_exists()
-        
-        # Create mock SNS topic
-        self.sns_client = boto3.client('sns', region_name='us-east-1')
-        response = self.sns_client.create_topic(Name='test-notifications')
-        self.topic_arn = response['TopicArn']
-        
-        # Create mock Lambda context
-        self.lambda_context = Mock()
-        self.lambda_context.request_id = 'test-request-id'
-        self.lambda_context.function_name = 'test-notification'
-        self.lambda_context.function_version = '$LATEST'
-        self.lambda_context.invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:test-notification'
-        self.lambda_context.memory_limit_in_mb = 512
-        self.lambda_context.get_remaining_time_in_millis = Mock(return_value=30000)
-
-    def test_send_notification_api_success(self):
-        """Test successful notification sending via API"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': 'test@example.com',
-                'message': 'Test notification message',
-                'type': 'email',
-                'subject': 'Test Subject'
-            })
-        }
+@pytest.fixture
+def dynamodb_table(notification_table, truncate_table):
+    """Shared notifications table, emptied before each test"""
+    return truncate_table(notification_table)
 
-        response = notification.lambda_handler(event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['message'], 'Notification sent successfully')
-        self.assertIn('notification', body)
-        self.assertEqual(body['notification']['recipient'], 'test@example.com')
-        self.assertEqual(body['notification']['type'], 'email')
-        self.assertEqual(body['notification']['status'], 'sent')
-        self.assertIn('id', body['notification'])
-
-    def test_send_notification_api_invalid_data(self):
-        """Test notification sending with invalid data"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': '',  # Empty recipient
-                'message': '',    # Empty message
-                'type': 'invalid' # Invalid type
-            })
-        }
 
-        response = notification.lambda_handler(event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 400)
-        body = json.loads(response['body'])
-        self.assertIn('error', body)
-
-    def test_sns_event_processing(self):
-        """Test SNS event processing"""
-        sns_event = {
-            'Records': [
-                {
-                    'EventSource': 'aws:sns',
-                    'Sns': {
-                        'TopicArn': 'arn:aws:sns:us-east-1:123456789012:test-notifications',
-                        'Message': json.dumps({
-                            'recipient': 'test@example.com',
-                            'message': 'SNS triggered notification',
-                            'type': 'email'
-                        }),
-                        'Subject': 'Test SNS Notification',
-                        'MessageId': 'test-message-id'
-                    }
-                }
-            ]
-        }
+@pytest.fixture(scope='module')
+def sns_topic(sns_client):
+    """Create the notifications topic once under the module's moto mock"""
+    return sns_client.create_topic(Name='test-notifications')['TopicArn']
 
-        response = notification.lambda_handler(sns_event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['message'], 'SNS event processed successfully')
-        self.assertIn('processed_records', body)
-        self.assertEqual(body['processed_records'], 1)
-
-    def test_email_notification(self):
-        """Test email notification processing"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': 'user@example.com',
-                'message': 'This is an email notification',
-                'type': 'email',
-                'subject': 'Important Email'
-            })
-        }
 
-        response = notification.lambda_handler(event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['notification']['type'], 'email')
-        self.assertEqual(body['notification']['recipient'], 'user@example.com')
-        self.assertEqual(body['notification']['subject'], 'Important Email')
-
-    def test_sms_notification(self):
-        """Test SMS notification processing"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': '+1234567890',
-                'message': 'This is an SMS notification',
-                'type': 'sms'
-            })
-        }
+class TestNotification:
+    """Test cases for Notification Lambda function"""
 
-        response = notification.lambda_handler(event, self.lambda_context)
+    def test_send_notification_api_success(self, notification, dynamodb_table, sns_topic, lambda_context):
+        """Test successful notification sending via API"""
+        response = notification.lambda_handler(SUBJECT_EMAIL_EVENT, lambda_context)
         
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['notification']['type'], 'sms')
-        self.assertEqual(body['notification']['recipient'], '+1234567890')
-
-    def test_invalid_recipient_email(self):
-        """Test notification with invalid email format"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': 'invalid-email-format',
-                'message': 'Test message',
-                'type': 'email'
-            })
-        }
-
-        response = notification.lambda_handler(event, self.lambda_context)
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['message'] == 'Notification sent successfully'
+        assert 'notification' in body
+        assert body['notification']['recipient'] == 'test@example.com'
+        assert body['notification']['type'] == 'email'
+        assert body['notification']['status'] == 'sent'
+        assert 'id' in body['notification']
+
+    @pytest.mark.parametrize('body', [
+        pytest.param(None, id='missing-body'),
+        pytest.param({'recipient': '', 'message': '', 'type': 'invalid'}, id='empty-fields-invalid-type'),
+        pytest.param({'recipient': 'invalid-email-format', 'message': 'Test message', 'type': 'email'}, id='invalid-email'),
+        pytest.param({'recipient': 'invalid-phone', 'message': 'Test message', 'type': 'sms'}, id='invalid-phone')
+    ])
+    def test_invalid_inputs(self, notification, lambda_context, body):
+        """Test that invalid notification requests are rejected"""
+        response = notification.lambda_handler(make_api_event(body), lambda_context)
         
-        self.assertEqual(response['statusCode'], 400)
-        body = json.loads(response['body'])
-        self.assertIn('error', body)
-
-    def test_invalid_recipient_phone(self):
-        """Test notification with invalid phone format"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': 'invalid-phone',
-                'message': 'Test message',
-                'type': 'sms'
-            })
-        }
-
-        response = notification.lambda_handler(event, self.lambda_context)
+        assert response['statusCode'] == 400
+        body = orjson.loads(response['body'])
+        assert 'error' in body
+
+    @pytest.mark.parametrize('n', [1, 2, 10])
+    def test_sns_event_processing(self, notification, dynamodb_table, sns_topic, lambda_context, n):
+        """Test SNS event processing for one or more records in one event"""
+        response = notification.lambda_handler(make_sns_event(n), lambda_context)
         
-        self.assertEqual(response['statusCode'], 400)
-        body = json.loads(response['body'])
-        self.assertIn('error', body)
-
-    def test_missing_body(self):
-        """Test API request with missing body"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': None
-        }
-
-        response = notification.lambda_handler(event, self.lambda_context)
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['message'] == 'SNS event processed successfully'
+        assert 'processed_records' in body
+        assert body['processed_records'] == n
+
+        # All notifications are recorded in a single batch
+        items = dynamodb_table.scan()['Items']
+        assert len(items) == n
+        assert all(item['notification_status'] == 'processed' for item in items)
+
+    @pytest.mark.parametrize('payload, expected_fields', [
+        pytest.param(
+            {'recipient': 'user@example.com', 'message': 'This is an email notification', 'type': 'email', 'subject': 'Important Email'},
+            {'type': 'email', 'recipient': 'user@example.com', 'subject': 'Important Email'},
+            id='email'
+        ),
+        pytest.param(
+            {'recipient': '+1234567890', 'message': 'This is an SMS notification', 'type': 'sms'},
+            {'type': 'sms', 'recipient': '+1234567890'},
+            id='sms'
+        ),
+        # The response does not include priority; the request must still be processed
+        pytest.param(
+            {'recipient': 'urgent@example.com', 'message': 'Urgent notification', 'type': 'email',
+             'priority': 'high', 'subject': 'URGENT: Action Required'},
+            {'recipient': 'urgent@example.com'},
+            id='priority'
+        )
+    ])
+    def test_notification_types(self, notification, dynamodb_table, sns_topic, lambda_context, payload, expected_fields):
+        """Test notification processing for each notification type"""
+        response = notification.lambda_handler(make_api_event(payload), lambda_context)
         
-        self.assertEqual(response['statusCode'], 400)
-        body = json.loads(response['body'])
-        self.assertIn('error', body)
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        for field, value in expected_fields.items():
+            assert body['notification'][field] == value
 
-    def test_invalid_request_method(self):
+    def test_invalid_request_method(self, notification, lambda_context):
         """Test invalid HTTP method"""
-        event = {
-            'httpMethod': 'GET',
-            'resource': '/notify',
-            'body': json.dumps({'recipient': 'test@example.com', 'message': 'test'})
-        }
-
-        response = notification.lambda_handler(event, self.lambda_context)
+        response = notification.lambda_handler(GET_EVENT, lambda_context)
         
-        self.assertEqual(response['statusCode'], 404)
-        body = json.loads(response['body'])
-        self.assertEqual(body['error'], 'Resource not found')
+        assert response['statusCode'] == 404
+        body = orjson.loads(response['body'])
+        assert body['error'] == 'Resource not found'
 
-    def test_cors_headers(self):
+    def test_cors_headers(self, notification, dynamodb_table, sns_topic, lambda_context):
         """Test CORS headers in response"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': 'test@example.com',
-                'message': 'Test message',
-                'type': 'email'
-            })
-        }
-
-        response = notification.lambda_handler(event, self.lambda_context)
+        response = notification.lambda_handler(EMAIL_EVENT, lambda_context)
         
-        self.assertIn('headers', response)
+        assert 'headers' in response
         headers = response['headers']
-        self.assertIn('Access-Control-Allow-Origin', headers)
-        self.assertEqual(headers['Access-Control-Allow-Origin'], '*')
+        assert 'Access-Control-Allow-Origin' in headers
+        assert headers['Access-Control-Allow-Origin'] == '*'
 
-    def test_exception_handling(self):
+    def test_exception_handling(self, notification, lambda_context):
         """Test exception handling when services are unavailable"""
-        with patch('notification.DynamoDBManager.put_item', side_effect=Exception('Database error')):
-            event = {
-                'httpMethod': 'POST',
-                'resource': '/notify',
-                'body': json.dumps({
-                    'recipient': 'test@example.com',
-                    'message': 'Test message',
-                    'type': 'email'
-                })
-            }
-
-            response = notification.lambda_handler(event, self.lambda_context)
+        with patch.object(notification.SNS_CLIENT, 'publish', return_value={'MessageId': 'test-id'}), \
+                patch.object(notification.DynamoDBManager, 'put_item', side_effect=Exception('Database error')):
+            response = notification.lambda_handler(EMAIL_EVENT, lambda_context)
             
-            self.assertEqual(response['statusCode'], 500)
-            body = json.loads(response['body'])
-            self.assertEqual(body['error'], 'Failed to send notification')
+            assert response['statusCode'] == 500
+            body = orjson.loads(response['body'])
+            assert body['error'] == 'Failed to send notification'
 
-    @patch('notification.get_current_timestamp')
-    def test_timestamp_generation(self, mock_timestamp):
+    def test_timestamp_generation(self, notification, dynamodb_table, sns_topic, lambda_context):
         """Test timestamp generation in notification"""
-        mock_timestamp.return_value = '2023-01-01T12:00:00Z'
+        with patch.object(notification, 'get_current_timestamp', return_value='2023-01-01T12:00:00Z') as mock_timestamp:
+            response = notification.lambda_handler(EMAIL_EVENT, lambda_context)
         
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': 'test@example.com',
-                'message': 'Test message',
-                'type': 'email'
-            })
-        }
-
-        response = notification.lambda_handler(event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 200)
+        assert response['statusCode'] == 200
         # Note: The notification response doesn't include sent_at field currently
         # This test validates timestamp is being called internally
-        self.assertGreaterEqual(mock_timestamp.call_count, 1)
-
-    def test_multiple_sns_records(self):
-        """Test processing multiple SNS records in one event"""
-        sns_event = {
-            'Records': [
-                {
-                    'EventSource': 'aws:sns',
-                    'Sns': {
-                        'TopicArn': 'arn:aws:sns:us-east-1:123456789012:test-notifications',
-                        'Message': json.dumps({
-                            'recipient': 'user1@example.com',
-                            'message': 'Message 1',
-                            'type': 'email'
-                        }),
-                        'MessageId': 'message-1'
-                    }
-                },
-                {
-                    'EventSource': 'aws:sns',
-                    'Sns': {
-                        'TopicArn': 'arn:aws:sns:us-east-1:123456789012:test-notifications',
-                        'Message': json.dumps({
-                            'recipient': 'user2@example.com',
-                            'message': 'Message 2',
-                            'type': 'email'
-                        }),
-                        'MessageId': 'message-2'
-                    }
-                }
-            ]
-        }
+        assert mock_timestamp.call_count >= 1
 
-        response = notification.lambda_handler(sns_event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        self.assertEqual(body['processed_records'], 2)
-
-    def test_notification_priority(self):
-        """Test notification with priority setting"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': 'urgent@example.com',
-                'message': 'Urgent notification',
-                'type': 'email',
-                'priority': 'high',
-                'subject': 'URGENT: Action Required'
-            })
-        }
+    def test_send_notifications_batch(self, notification, sns_client, sns_topic):
+        """Test batched notification sending across multiple PublishBatch calls"""
+        items = [
+            {'recipient': f'user{i}@example.com', 'message': f'Message {i}', 'type': 'email', 'subject': 'Batch'}
+            for i in range(11)
+        ]
+        items.append({'recipient': '+1234567890', 'message': 'SMS message', 'type': 'sms'})
 
-        response = notification.lambda_handler(event, self.lambda_context)
-        
-        self.assertEqual(response['statusCode'], 200)
-        body = json.loads(response['body'])
-        # Note: The notification response doesn't include priority field currently
-        # This test validates the request is processed successfully even with priority
-        self.assertEqual(body['notification']['recipient'], 'urgent@example.com')
-
-    @patch('boto3.client')
-    def test_sns_publish_error(self, mock_boto_client):
-        """Test SNS publish error handling"""
+        results = notification.send_notifications_batch(items, sns_client)
+
+        assert len(results) == 12
+        assert all(result['success'] for result in results)
+        assert all('message_id' in result for result in results)
+
+    def test_send_notifications_batch_failed_entries(self, notification):
+        """Test that sender-side failures in PublishBatch are reported without retry"""
         mock_sns = Mock()
-        mock_sns.publish.side_effect = Exception('SNS publish failed')
-        mock_boto_client.return_value = mock_sns
-        
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/notify',
-            'body': json.dumps({
-                'recipient': 'test@example.com',
-                'message': 'Test message',
-                'type': 'email'
-            })
+        mock_sns.publish_batch.return_value = {
+            'Successful': [{'Id': '0', 'MessageId': 'message-0'}],
+            'Failed': [{'Id': '1', 'Code': 'InvalidParameter', 'Message': 'Invalid', 'SenderFault': True}]
         }
+        items = [
+            {'recipient': 'user0@example.com', 'message': 'Message 0', 'type': 'email'},
+            {'recipient': 'user1@example.com', 'message': 'Message 1', 'type': 'email'}
+        ]
 
-        response = notification.lambda_handler(event, self.lambda_context)
-        
-        # Should handle error gracefully
-        self.assertIn(response['statusCode'], [200, 500])
+        results = notification.send_notifications_batch(items, mock_sns)
+
+        assert mock_sns.publish_batch.call_count == 1
+        assert results[0] == {'success': True, 'message_id': 'message-0'}
+        assert not results[1]['success']
 
+    def test_send_notifications_batch_retries_server_failures(self, notification):
+        """Test that non-sender failures are retried with backoff until they succeed"""
+        mock_sns = Mock()
+        mock_sns.publish_batch.side_effect = [
+            {
+                'Successful': [{'Id': '0', 'MessageId': 'message-0'}],
+                'Failed': [{'Id': '1', 'Code': 'InternalError', 'Message': 'Internal', 'SenderFault': False}]
+            },
+            {'Successful': [{'Id': '1', 'MessageId': 'message-1'}], 'Failed': []}
+        ]
+        items = [
+            {'recipient': 'user0@example.com', 'message': 'Message 0', 'type': 'email'},
+            {'recipient': 'user1@example.com', 'message': 'Message 1', 'type': 'email'}
+        ]
+
+        with patch.object(notification.time, 'sleep') as mock_sleep:
+            results = notification.send_notifications_batch(items, mock_sns)
+
+        assert mock_sns.publish_batch.call_count == 2
+        # Only the failed entry is sent again
+        retried = mock_sns.publish_batch.call_args.kwargs['PublishBatchRequestEntries']
+        assert [entry['Id'] for entry in retried] == ['1']
+        mock_sleep.assert_called_once_with(notification.SNS_PUBLISH_BASE_DELAY)
+        assert results == [
+            {'success': True, 'message_id': 'message-0'},
+            {'success': True, 'message_id': 'message-1'}
+        ]
+
+    def test_send_notifications_batch_missing_entries(self, notification):
+        """Test that entries absent from both Successful and Failed are reported as failures"""
+        mock_sns = Mock()
+        mock_sns.publish_batch.return_value = {'Successful': [{'Id': '0', 'MessageId': 'message-0'}], 'Failed': []}
+        items = [
+            {'recipient': 'user0@example.com', 'message': 'Message 0', 'type': 'email'},
+            {'recipient': 'user1@example.com', 'message': 'Message 1', 'type': 'email'}
+        ]
 
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+        results = notification.send_notifications_batch(items, mock_sns)
+
+        assert results[0] == {'success': True, 'message_id': 'message-0'}
+        assert results[1]['success'] is False
+
+    def test_sns_publish_error(self, notification, lambda_context):
+        """Test SNS publish error handling"""
+        stubber = Stubber(notification.SNS_CLIENT)
+        stubber.add_client_error('publish', service_error_code='InternalError', service_message='SNS publish failed')
+
+        with stubber, patch.object(notification.DynamoDBManager, 'put_item', return_value=True) as mock_put_item:
+            response = notification.lambda_handler(EMAIL_EVENT, lambda_context)
+
+        # The publish failure is recorded on the notification rather than failing the request
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['notification']['status'] == 'failed'
+        assert 'SNS publish failed' in mock_put_item.call_args.args[0]['error']
+        stubber.assert_no_pending_responses()
@@ -1,187 +1,128 @@
-import json
-import os
+import orjson
 import pytest
-import uuid
-from unittest.mock import Mock
-import boto3
-from moto import mock_aws
 
-# Set environment variables before importing the module
-os.environ['ENVIRONMENT'] = 'test'
-os.environ['LOG_LEVEL'] = 'DEBUG'
-os.environ['USER_TABLE_NAME'] = 'test-users'
-os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+# Request bodies and events shared by the tests, serialized once at import
+CREATE_USER_BODY = orjson.dumps({
+    'name': 'Test User',
+    'email': 'test@example.com',
+    'phone': '090-1234-5678'
+}).decode()
+INVALID_USER_BODY = orjson.dumps({
+    'username': '',  # Empty username
+    'email': 'invalid-email',  # Invalid email
+    'phone': 'invalid-phone'  # Invalid phone
+}).decode()
+INVALID_EMAIL_BODY = orjson.dumps({'name': 'John Doe', 'email': 'invalid-email'}).decode()
+MISSING_EMAIL_BODY = orjson.dumps({'name': 'John Doe'}).decode()
+CREATE_USER_EVENT = {
+    'httpMethod': 'POST',
+    'resource': '/users',
+    'body': CREATE_USER_BODY
+}
+
+# Users stored by the seeded_users fixture, built once at import
+SEED_USERS = tuple(
+    {
+        'id': f'user-{i}',
+        'username': f'testuser{i}',
+        'email': f'test{i}@example.com',
+        'phone': '+81-90-1234-567' + str(i),
+        'created_at': '2023-01-01T12:00:00Z'
+    }
+    for i in range(5)
+)
+
+
+@pytest.fixture(scope='module')
+def users_table(create_table):
+    """Create the users table once under the module's moto mock"""
+    return create_table('test-users')
 
-# Add source path
-import sys
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src/user_management'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src/layers/common/python'))
 
-# Import the module to test
-import user_management
+@pytest.fixture
+def dynamodb_table(users_table, truncate_table):
+    """Shared users table, emptied before each test"""
+    return truncate_table(users_table)
 
 
 @pytest.fixture
-def lambda_context():
-    """Mock Lambda context"""
-    context = Mock()
-    context.request_id = 'test-request-id'
-    context.function_name = 'test-user-management'
-    context.function_version = '$LATEST'
-    context.invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:test-user-management'
-    context.memory_limit_in_mb = 512
-    context.get_remaining_time_in_millis = Mock(return_value=30000)
-    return context
+def seeded_users(dynamodb_table):
+    """SEED_USERS written to the emptied table in one batch"""
+    with dynamodb_table.batch_writer() as batch:
+        for user in SEED_USERS:
+            batch.put_item(Item=user)
+    return SEED_USERS
 
 
-@pytest.fixture
-def dynamodb_table(dynamodb_resource):
-    """Create a mock DynamoDB table"""
-    table = dynamodb_resource.create_table(
-        TableName='test-users',
-        KeySchema=[
-            {
-                'AttributeName': 'id',
-                'KeyType': 'HASH'
-            }
-        ],
-        AttributeDefinitions=[
-            {
-                'AttributeName': 'id',
-                'AttributeType': 'S'
-            }
-        ],
-        BillingMode='PAY_PER_REQUEST'
-    )
-    
-    # Wait for table to be created
-    table.wait_until_exists()
-    
-    return table
 class TestUserManagement:
     """Test cases for User Management Lambda function"""
 
-    def test_create_user_success(self, dynamodb_table, lambda_context):
+    def test_create_user_success(self, user_management, dynamodb_table, lambda_context):
         """Test successful user creation"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/users',
-            'body': json.dumps({
-                'username': 'testuser',
-                'email': 'test@example.com',
-                'phone': '+81-90-1234-5678'
-            })
-        }
-
-        response = user_management.lambda_handler(event, lambda_context)
+        response = user_management.lambda_handler(CREATE_USER_EVENT, lambda_context)
         
         assert response['statusCode'] == 201
-        body = json.loads(response['body'])
+        body = orjson.loads(response['body'])
         assert body['message'] == 'User created successfully'
         assert 'user' in body
-        assert body['user']['username'] == 'testuser'
+        assert body['user']['name'] == 'Test User'
         assert body['user']['email'] == 'test@example.com'
         assert 'id' in body['user']
-
-    def test_create_user_invalid_data(self, dynamodb_table, lambda_context):
-        """Test user creation with invalid data"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/users',
-            'body': json.dumps({
-                'username': '',  # Empty username
-                'email': 'invalid-email',  # Invalid email
-                'phone': 'invalid-phone'  # Invalid phone
-            })
-        }
-
+        assert 'created_at' in body['user']
+
+    @pytest.mark.parametrize('event, error', [
+        pytest.param({'httpMethod': 'POST', 'resource': '/users', 'body': INVALID_USER_BODY},
+                     'Missing required fields', id='create-invalid-data'),
+        pytest.param({'httpMethod': 'POST', 'resource': '/users', 'body': INVALID_EMAIL_BODY},
+                     'Invalid email format', id='create-invalid-email'),
+        pytest.param({'httpMethod': 'POST', 'resource': '/users', 'body': MISSING_EMAIL_BODY},
+                     'Missing required fields', id='create-missing-email'),
+        pytest.param({'httpMethod': 'POST', 'resource': '/users', 'body': None}, None, id='create-missing-body'),
+        pytest.param({'httpMethod': 'GET', 'resource': '/users/{id}', 'pathParameters': None},
+                     'User ID is required', id='get-missing-id')
+    ])
+    def test_invalid_requests(self, user_management, lambda_context, event, error):
+        """Test that invalid user requests are rejected"""
         response = user_management.lambda_handler(event, lambda_context)
         
         assert response['statusCode'] == 400
-        body = json.loads(response['body'])
+        body = orjson.loads(response['body'])
         assert 'error' in body
+        if error:
+            assert error in body['error']
 
-    def test_create_user_missing_body(self, dynamodb_table, lambda_context):
-        """Test user creation with missing body"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/users',
-            'body': None
-        }
-
-        response = user_management.lambda_handler(event, lambda_context)
-        
-        assert response['statusCode'] == 400
-        body = json.loads(response['body'])
-        assert 'error' in body
-
-    def test_get_user_success(self, dynamodb_table, lambda_context):
+    def test_get_user_success(self, user_management, seeded_users, lambda_context):
         """Test successful user retrieval"""
-        # First create a user
-        user_id = str(uuid.uuid4())
-        test_user = {
-            'id': user_id,
-            'username': 'testuser',
-            'email': 'test@example.com',
-            'phone': '+81-90-1234-5678',
-            'created_at': '2023-01-01T12:00:00Z'
-        }
-        dynamodb_table.put_item(Item=test_user)
-
+        user = seeded_users[0]
         event = {
             'httpMethod': 'GET',
             'resource': '/users/{id}',
-            'pathParameters': {'id': user_id}
+            'pathParameters': {'id': user['id']}
         }
 
         response = user_management.lambda_handler(event, lambda_context)
         
         assert response['statusCode'] == 200
-        body = json.loads(response['body'])
-        assert body['user']['id'] == user_id
-        assert body['user']['username'] == 'testuser'
-
-    def test_get_user_not_found(self, dynamodb_table, lambda_context):
-        """Test user retrieval with non-existent ID"""
-        event = {
-            'httpMethod': 'GET',
-            'resource': '/users/{id}',
-            'pathParameters': {'id': 'non-existent-id'}
-        }
-
+        body = orjson.loads(response['body'])
+        assert body['user']['id'] == user['id']
+        assert body['user']['username'] == user['username']
+
+    @pytest.mark.parametrize('event, error', [
+        pytest.param({'httpMethod': 'GET', 'resource': '/users/{id}', 'pathParameters': {'id': 'non-existent-id'}},
+                     'User not found', id='unknown-user'),
+        pytest.param({'httpMethod': 'GET', 'resource': '/invalid', 'pathParameters': None},
+                     'Resource not found', id='invalid-resource')
+    ])
+    def test_not_found(self, user_management, dynamodb_table, lambda_context, event, error):
+        """Test that unknown users and resources return 404"""
         response = user_management.lambda_handler(event, lambda_context)
         
         assert response['statusCode'] == 404
-        body = json.loads(response['body'])
-        assert body['error'] == 'User not found'
-
-    def test_get_user_missing_id(self, dynamodb_table, lambda_context):
-        """Test user retrieval with missing ID"""
-        event = {
-            'httpMethod': 'GET',
-            'resource': '/users/{id}',
-            'pathParameters': None
-        }
+        body = orjson.loads(response['body'])
+        assert body['error'] == error
 
-        response = user_management.lambda_handler(event, lambda_context)
-        
-        assert response['statusCode'] == 400
-        body = json.loads(response['body'])
-        assert 'error' in body
-
-    def test_list_users_success(self, dynamodb_table, lambda_context):
+    def test_list_users_success(self, user_management, seeded_users, lambda_context):
         """Test successful user listing"""
-        # Create test users
-        for i in range(3):
-            test_user = {
-                'id': str(uuid.uuid4()),
-                'username': f'testuser{i}',
-                'email': f'test{i}@example.com',
-                'phone': '+81-90-1234-567' + str(i),
-                'created_at': '2023-01-01T12:00:00Z'
-            }
-            dynamodb_table.put_item(Item=test_user)
-
         event = {
             'httpMethod': 'GET',
             'resource': '/users',
@@ -191,11 +132,12 @@ class TestUserManagement:
         response = user_management.lambda_handler(event, lambda_context)
         
         assert response['statusCode'] == 200
-        body = json.loads(response['body'])
+        body = orjson.loads(response['body'])
         assert 'users' in body
-        assert len(body['users']) >= 3
+        assert len(body['users']) == len(seeded_users)
+        assert body['count'] == len(seeded_users)
 
-    def test_list_users_with_limit(self, dynamodb_table, lambda_context):
+    def test_list_users_with_limit(self, user_management, seeded_users, lambda_context):
         """Test user listing with limit parameter"""
         event = {
             'httpMethod': 'GET',
@@ -206,36 +148,13 @@ class TestUserManagement:
         response = user_management.lambda_handler(event, lambda_context)
         
         assert response['statusCode'] == 200
-        body = json.loads(response['body'])
+        body = orjson.loads(response['body'])
         assert 'users' in body
+        assert len(body['users']) == 2
 
-    def test_invalid_resource(self, dynamodb_table, lambda_context):
-        """Test invalid resource path"""
-        event = {
-            'httpMethod': 'GET',
-            'resource': '/invalid',
-            'pathParameters': None
-        }
-
-        response = user_management.lambda_handler(event, lambda_context)
-        
-        assert response['statusCode'] == 404
-        body = json.loads(response['body'])
-        assert body['error'] == 'Resource not found'
-
-    def test_cors_headers(self, dynamodb_table, lambda_context):
+    def test_cors_headers(self, user_management, dynamodb_table, lambda_context):
         """Test CORS headers in response"""
-        event = {
-            'httpMethod': 'POST',
-            'resource': '/users',
-            'body': json.dumps({
-                'username': 'testuser',
-                'email': 'test@example.com',
-                'phone': '+81-90-1234-5678'
-            })
-        }
-
-        response = user_management.lambda_handler(event, lambda_context)
+        response = user_management.lambda_handler(CREATE_USER_EVENT, lambda_context)
         
         assert 'headers' in response
         headers = response['headers']
@@ -0,0 +1,57 @@
+import json
+import pytest
+
+import utils
+
+
+class TestUtils:
+    """Test cases for the common layer utilities"""
+
+    @pytest.mark.parametrize('raw', [
+        pytest.param('{"data": "test", "type": "text"}', id='plain'),
+        pytest.param('{"id": 123456789012345678901234567890}', id='wide-int'),
+        pytest.param('{"id": -98765432109876543210}', id='wide-negative-int'),
+        pytest.param('{"id": -9999999999999999999}', id='below-int64-min'),
+        pytest.param('{"score": NaN, "max": Infinity}', id='nan-infinity'),
+        pytest.param('{"text": "\\ud800"}', id='lone-surrogate')
+    ])
+    def test_json_loads_matches_stdlib(self, raw):
+        """Test that json_loads returns what json.loads returns for the same body"""
+        parsed = utils.json_loads(raw)
+
+        assert json.dumps(parsed) == json.dumps(json.loads(raw))
+        assert [type(v) for v in parsed.values()] == [type(v) for v in json.loads(raw).values()]
+
+    def test_json_loads_invalid_json(self):
+        """Test that malformed JSON still raises JSONDecodeError"""
+        with pytest.raises(json.JSONDecodeError):
+            utils.json_loads('{invalid')
+
+    def test_json_dumps_non_str_keys(self):
+        """Test that non-string dict keys are serialized as strings like json.dumps"""
+        body = {1: 'one', 'nested': {2: 'two'}}
+
+        assert json.loads(utils.json_dumps(body)) == json.loads(json.dumps(body))
+
+    def test_json_dumps_wide_int(self):
+        """Test that ints wider than 64 bits are serialized exactly like json.dumps"""
+        body = {'department': 1180591620717411303424, 'counts': {1: -98765432109876543210}}
+
+        assert utils.json_dumps(body) == json.dumps(body, default=str)
+
+    def test_create_response_int_keys(self):
+        """Test that a response body with int keys is serialized instead of failing"""
+        response = utils.create_response(200, {'counts': {404: 1, 500: 2}})
+
+        assert response['statusCode'] == 200
+        assert json.loads(response['body']) == {'counts': {'404': 1, '500': 2}}
+
+    def test_create_response_headers_not_shared(self):
+        """Test that mutating one response's headers does not change later responses"""
+        first = utils.create_response(200, {})
+        first['headers']['X-Mutated'] = 'yes'
+
+        second = utils.create_response(200, {})
+
+        assert 'X-Mutated' not in second['headers']
+        assert 'X-Mutated' not in utils.DEFAULT_HEADERS